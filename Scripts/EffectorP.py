@@ -29,10 +29,63 @@
 import os
 import sys
 import functions
-import subprocess
-import errno
-import uuid
-import shutil
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+# EffectorP predictor that can be reused across many inputs
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+
+class EffectorP(object):
+    """ Class: EffectorP
+
+        Purpose:  Resolve the script folder and load the EffectorP model once,
+                  so that many inputs can be classified with predict() without
+                  paying the startup cost again.
+
+        Input:    Path to the folder that contains the model file (defaults to
+                  the folder of this script) and the minimum protein length
+                  that is classified.
+    """
+    def __init__(self, SCRIPT_PATH = None, min_length = functions.MIN_LENGTH):
+        if SCRIPT_PATH is None:
+            SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+        self.SCRIPT_PATH = SCRIPT_PATH
+        self.min_length = min_length
+        self.model = functions.load_model(SCRIPT_PATH)
+
+    def predict(self, ORIGINAL_IDENTIFIERS, SEQUENCES):
+        """ Function: predict()
+
+            Purpose:  Compute the protein features and classify them with the 
+                      EffectorP model. Proteins shorter than the minimum length
+                      are not classified and reported as non-effectors with 
+                      probability '-'. Identical sequences are classified once.
+
+            Input:    List of identifiers and list of sequences.
+
+            Return:   List of predicted effectors and list of all predictions
+                      as returned by parse_predictions().
+        """
+        candidates = [index for index, sequence in enumerate(SEQUENCES) if len(sequence.strip()) >= self.min_length]
+
+        # Map each candidate to the position of its sequence in the list of unique sequences
+        unique_index, unique_sequences, mapping = {}, [], []
+        for index in candidates:
+            sequence = SEQUENCES[index].strip()
+            if sequence not in unique_index:
+                unique_index[sequence] = len(unique_sequences)
+                unique_sequences.append(sequence)
+            mapping.append(unique_index[sequence])
+
+        X = functions.compute_features(unique_sequences)
+        unique_predictions = functions.predict_nb(self.model, X)
+
+        nb_predictions = [('non-effector', '-')] * len(SEQUENCES)
+        for index, position in zip(candidates, mapping):
+            nb_predictions[index] = unique_predictions[position]
+        return functions.parse_predictions(nb_predictions, ORIGINAL_IDENTIFIERS, SEQUENCES)
 # -----------------------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------------------
@@ -43,33 +96,10 @@ import shutil
 
 def main():
     # -----------------------------------------------------------------------------------------------------------
-    SCRIPT_PATH = sys.path[0]
-    # Change the path to WEKA to the appropriate location on your computer
-    WEKA_PATH = SCRIPT_PATH + '/weka-3-6-12/weka.jar'
-    PEPSTATS_PATH = SCRIPT_PATH + '/EMBOSS-6.5.7/emboss/'
-    # -----------------------------------------------------------------------------------------------------------
-    # Check that the path to the WEKA software exists
-    path_exists = os.access(WEKA_PATH, os.F_OK)
-    if not path_exists:
-        print()
-        print("Path to WEKA software does not exist!")
-        print("Check the installation and the given path to the WEKA software %s in EffectorP.py (line 47)." % WEKA_PATH)
-        print()
-        sys.exit(1)
-    # -----------------------------------------------------------------------------------------------------------
-    # Check that the path to the EMBOSS software exists for pepstats
-    path_exists = os.access(PEPSTATS_PATH, os.F_OK)
-    if not path_exists:
-        print()
-        print("Path to EMBOSS software does not exist!")
-        print("Check the installation and the given path to the EMBOSS software %s in EffectorP.py (line 48)." % PEPSTATS_PATH)
-        print()
-        sys.exit(1)
-    # -----------------------------------------------------------------------------------------------------------
     commandline = sys.argv[1:]
     # -----------------------------------------------------------------------------------------------------------
     if commandline:
-        FASTA_FILE, short_format, output_file, effector_output = functions.scan_arguments(commandline)
+        FASTA_FILE, short_format, output_file, effector_output, min_length = functions.scan_arguments(commandline)
 	# If no FASTA file was provided with the -i option
         if not FASTA_FILE:
             print()
@@ -78,135 +108,56 @@ def main():
     else:
         functions.usage()
     # -----------------------------------------------------------------------------------------------------------
-    # Temporary folder name identifier that will be used to store results
-    FOLDER_IDENTIFIER = str(uuid.uuid4())
-    # Path to temporary results folder
-    if not os.path.exists(SCRIPT_PATH + '/tmp/'):
-        os.makedirs(SCRIPT_PATH + '/tmp/')
-    RESULTS_PATH = SCRIPT_PATH + '/tmp/' + FOLDER_IDENTIFIER + '/'
-    # -----------------------------------------------------------------------------------------------------------
-    # Check if FASTA file exists
+    # Extract the identifiers and sequences from input FASTA file, the file is opened only once
+    # so that pipes and FIFOs are read completely
     try:
-        open(FASTA_FILE, 'r')
+        ORIGINAL_IDENTIFIERS, SEQUENCES = functions.get_seqs_ids_fasta(FASTA_FILE)
     except OSError as e:
         print("Unable to open FASTA file:", FASTA_FILE)  # Does not exist OR no read permissions
         print("I/O error({0}): {1}".format(e.errno, e.strerror))
         sys.exit(1)
-    # -----------------------------------------------------------------------------------------------------------
-    # Try to create folder where results will be stored
-    try:
-        os.mkdir(RESULTS_PATH)
-    except OSError as exception:
-        if exception.errno != errno.EEXIST:
-            raise
-    # -----------------------------------------------------------------------------------------------------------
-    # Extract the identifiers and sequences from input FASTA file
-    ORIGINAL_IDENTIFIERS, SEQUENCES = functions.get_seqs_ids_fasta(FASTA_FILE)
+    # Check if FASTA file contains any records
+    if not ORIGINAL_IDENTIFIERS:
+        print("No FASTA records found in FASTA file:", FASTA_FILE)  # Empty OR no '>' header lines
+        sys.exit(1)
     # -----------------------------------------------------------------------------------------------------------
     print('-----------------')
     print()
     print("EffectorP is running for", len(ORIGINAL_IDENTIFIERS), "proteins given in FASTA file", FASTA_FILE)
     print()
     # -----------------------------------------------------------------------------------------------------------
-    # Write new FASTA file with short identifiers because pepstats can't handle long names
-    f_output = RESULTS_PATH + FOLDER_IDENTIFIER + '_short_ids.fasta'
-    SHORT_IDENTIFIERS = functions.write_FASTA_short_ids(f_output, ORIGINAL_IDENTIFIERS, SEQUENCES)
-    # -----------------------------------------------------------------------------------------------------------
-    # Call pepstats
-    print('Call pepstats...')
-    ProcessExe = PEPSTATS_PATH + 'pepstats'
-    ParamList = [ProcessExe, '-sequence', RESULTS_PATH + FOLDER_IDENTIFIER + '_short_ids.fasta',
-              '-outfile', RESULTS_PATH + FOLDER_IDENTIFIER + '.pepstats']
-
-    try:
-        Process = subprocess.Popen(ParamList, shell=False)
-        sts = Process.wait()
-        cstdout, cstderr = Process.communicate()
-
-        if Process.returncode:
-            raise Exception("Calling pepstats returned %s" % Process.returncode)
-        if cstdout:
-            pass
-        elif cstderr:
-            sys.exit()
-    except:
-        e = sys.exc_info()[1]
-        print("Error calling pepstats: %s" % e)
-        sys.exit()
-    print('Done.')
-    print()
-    # -----------------------------------------------------------------------------------------------------------
-    # Parse pepstats file
-    print('Scan pepstats file')
-    pepstats_dic = functions.pepstats(SHORT_IDENTIFIERS, SEQUENCES, RESULTS_PATH + FOLDER_IDENTIFIER + '.pepstats')
+    # Compute the protein features and classify them with the EffectorP Naive Bayes model
+    print('Start classification with EffectorP...')
+    predicted_effectors, predictions = EffectorP(min_length = min_length).predict(ORIGINAL_IDENTIFIERS, SEQUENCES)
     print('Done.')
     print()
-    # -----------------------------------------------------------------------------------------------------------
-    # Write the WEKA arff file for classification of the input FASTA file
-    weka_input = RESULTS_PATH + FOLDER_IDENTIFIER + '.arff'
-    functions.write_weka_input(weka_input, SHORT_IDENTIFIERS, pepstats_dic)
-    # -----------------------------------------------------------------------------------------------------------
-    # Call WEKA Naive Bayes model for classification of input FASTA file
-    print('Start classification with EffectorP...')
-
-    ParamList = ['java', '-cp', WEKA_PATH, 'weka.classifiers.bayes.NaiveBayes', '-l', SCRIPT_PATH + '/trainingdata_samegenomes_iteration15_ratio3_bayes.model',
-             '-T', RESULTS_PATH + FOLDER_IDENTIFIER + '.arff', '-p', 'first-last']
-
-    with open(RESULTS_PATH + FOLDER_IDENTIFIER + '_Predictions.txt', 'wb') as out:
-        try:
-            Process = subprocess.Popen(ParamList, shell=False, stdout=out)
-            sts = Process.wait()
-            cstdout, cstderr = Process.communicate()
-
-            if Process.returncode:
-                raise Exception("Calling WEKA returned %s"%Process.returncode)
-            if cstdout:
-                pass
-            elif cstderr:
-                sys.exit(1)
-        except:
-            e = sys.exc_info()[1]
-            print("Error calling WEKA: %s" % e)
-            sys.exit(1)
-        print('Done.')
-        print()
-        print('-----------------')
-    # -----------------------------------------------------------------------------------------------------------
-    # Parse the WEKA output file
-    file_input = RESULTS_PATH + FOLDER_IDENTIFIER + '_Predictions.txt'
-    predicted_effectors, predictions = functions.parse_weka_output(file_input, ORIGINAL_IDENTIFIERS, SEQUENCES)
+    print('-----------------')
     # -----------------------------------------------------------------------------------------------------------
     # If user wants the stdout output directed to a specified file
     if output_file:
 
-        with open(output_file, 'wb') as out:
+        with open(output_file, 'w') as out:
             # Short format: output predictions for all proteins as tab-delimited table
-            if short_format:
-                out.writelines(functions.short_output(predictions))
+            out.writelines(functions.short_output(predictions))
             # If the user wants to see the long format, output additional information and stats
-            else:
-                out.writelines(functions.short_output(predictions))
-                out.writelines(functions.long_output(ORIGINAL_IDENTIFIERS, predicted_effectors))
+            if not short_format:
+                out.writelines(functions.long_output(predictions, predicted_effectors, min_length))
         print('EffectorP results were saved to output file:', output_file)
 
     else:
         # Short format: output predictions for all proteins as tab-delimited table to stdout
-        if short_format:
-            print(functions.short_output(predictions))
+        sys.stdout.writelines(functions.short_output(predictions))
+        print()
         # If the user wants to see the long format, output additional information and stats
-        else:
-            print(functions.short_output(predictions))
-            print(functions.long_output(ORIGINAL_IDENTIFIERS, predicted_effectors))
+        if not short_format:
+            sys.stdout.writelines(functions.long_output(predictions, predicted_effectors, min_length))
+            print()
     # -----------------------------------------------------------------------------------------------------------
     # If the user additionally wants to save the predicted effectors in a provided FASTA file
     if effector_output:
         with open(effector_output, 'w') as f_output:
             for effector, prob, sequence in predicted_effectors:
-                f_output.writelines('>' + effector + ' | Effector probability: ' + str(prob) + '\n')
-                f_output.writelines(sequence + '\n')
-    # -----------------------------------------------------------------------------------------------------------
-    # Clean up and delete temporary folder that was created
-    shutil.rmtree(RESULTS_PATH)
+                f_output.write('>' + effector + ' | Effector probability: ' + str(prob) + '\n' + sequence + '\n')
     # -----------------------------------------------------------------------------------------------------------
     return
 
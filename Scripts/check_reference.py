@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+    EffectorP: predicting fungal effector proteins from secretomes using machine learning
+    Copyright (C) 2015-2016 Jana Sperschneider
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Please also see the CSIRO Disclaimer provided with EffectorP (LICENCE.txt).
+
+    Contact: jana.sperschneider@csiro.au
+"""
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+# -----------------------------------------------------------------------------------------------------------
+# Compare EffectorP against outputs recorded with pepstats of EMBOSS 6.5.7 (emboss-latest.tar.gz) and 
+# WEKA 3.6.12 (weka-3-6-12.zip) in the reference folder. The outputs were written by
+#   pepstats -sequence <fasta> -outfile <pepstats>
+#   java -cp weka.jar weka.classifiers.bayes.NaiveBayes -l <model> -T <arff> -p first-last
+# where the WEKA input contains the features that pepstats reported for each FASTA file. As in EffectorP 1.0, 
+# pepstats was given the sequences without stop codons and with the identifiers protein0, protein1, ...
+# -----------------------------------------------------------------------------------------------------------
+import os
+import re
+import sys
+import functions
+# -----------------------------------------------------------------------------------------------------------
+# FASTA files with recorded outputs, relative to the script folder
+REFERENCE_FILES = ['Effector_Testing.fasta', os.path.join('reference', 'Random_Testing.fasta')]
+# -----------------------------------------------------------------------------------------------------------
+def read_pepstats(pepstats_file):
+    """ Function: read_pepstats()
+
+        Purpose:  Read the pepstats features used by EffectorP from a pepstats 
+                  output file.
+
+        Input:    Path to pepstats output file.
+
+        Return:   List of (identifier, amino acid class percentages, molecular 
+                  weight, charge) tuples in the order of the proteins.
+    """
+    records = []
+    with open(pepstats_file) as f:
+        for line in f:
+            if line.startswith('PEPSTATS of '):
+                identifier = line.split()[2]
+            elif line.startswith('Molecular weight = '):
+                molecular_weight = float(line.split()[3])
+            elif 'Charge   = ' in line:
+                charge = float(line.split()[-1])
+            elif line.startswith('Property'):
+                amino_acid_classes = [float(next(f).split()[-1]) for residues in functions.AMINO_ACID_CLASSES]
+                records.append((identifier, amino_acid_classes, molecular_weight, charge))
+
+    return records
+# -----------------------------------------------------------------------------------------------------------
+def check_pepstats(X, pepstats_file):
+    """ Function: check_pepstats()
+
+        Purpose:  Compare the computed protein features with the recorded pepstats output.
+
+        Input:    Feature vectors and path to pepstats output file.
+
+        Return:   List of mismatch messages.
+    """
+    mismatches = []
+    records = read_pepstats(pepstats_file)
+
+    if len(records) != len(X):
+        return [pepstats_file + ': ' + str(len(records)) + ' pepstats records for ' + str(len(X)) + ' proteins']
+
+    for (identifier, amino_acid_classes, molecular_weight, charge), features in zip(records, X):
+        if features[:9] != amino_acid_classes or features[29:31] != [molecular_weight, charge]:
+            mismatches.append(pepstats_file + ': ' + identifier + ': pepstats ' + str(amino_acid_classes + [molecular_weight, charge]) +
+                              ', EffectorP ' + str(features[:9] + features[29:31]))
+
+    return mismatches
+# -----------------------------------------------------------------------------------------------------------
+def read_weka_predictions(weka_file):
+    """ Function: read_weka_predictions()
+
+        Purpose:  Read the predictions from a WEKA output file written with the
+                  -p option.
+
+        Input:    Path to WEKA output file.
+
+        Return:   List of (class index, probability) tuples in the order of
+                  the test instances.
+    """
+    predictions = []
+    with open(weka_file) as f:
+        for line in f:
+            match = re.match(r'\s*\d+\s+\S+\s+(\d+):\S+\s+\+?\s*([\d.]+)', line)
+            if match:
+                predictions.append((int(match.group(1)) - 1, float(match.group(2))))
+
+    return predictions
+# -----------------------------------------------------------------------------------------------------------
+def check_weka(model, X, weka_file):
+    """ Function: check_weka()
+
+        Purpose:  Compare the EffectorP predictions with the recorded WEKA predictions.
+
+        Input:    EffectorP model, feature vectors and path to WEKA output file.
+
+        Return:   List of mismatch messages.
+    """
+    mismatches = []
+    weka_predictions = read_weka_predictions(weka_file)
+    nb_predictions = functions.predict_nb(model, X)
+
+    if len(weka_predictions) != len(nb_predictions):
+        return [weka_file + ': ' + str(len(weka_predictions)) + ' WEKA predictions for ' + str(len(nb_predictions)) + ' proteins']
+
+    for instance, ((index, weka_prob), (prediction, prob)) in enumerate(zip(weka_predictions, nb_predictions), 1):
+        if model['classes'][index] != prediction or weka_prob != prob:
+            mismatches.append(weka_file + ': instance ' + str(instance) + ': WEKA ' + model['classes'][index] + ' ' + str(weka_prob) +
+                              ', EffectorP ' + prediction + ' ' + str(prob))
+
+    return mismatches
+# -----------------------------------------------------------------------------------------------------------
+def main():
+    # -----------------------------------------------------------------------------------------------------------
+    SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+    model = functions.load_model(SCRIPT_PATH)
+    # -----------------------------------------------------------------------------------------------------------
+    mismatches = []
+    for fasta_file in REFERENCE_FILES:
+        name = os.path.splitext(os.path.basename(fasta_file))[0]
+        ORIGINAL_IDENTIFIERS, SEQUENCES = functions.get_seqs_ids_fasta(os.path.join(SCRIPT_PATH, fasta_file))
+        X = functions.compute_features(SEQUENCES)
+        mismatches += check_pepstats(X, os.path.join(SCRIPT_PATH, 'reference', name + '.pepstats'))
+        mismatches += check_weka(model, X, os.path.join(SCRIPT_PATH, 'reference', name + '.weka'))
+        print('Checked', len(ORIGINAL_IDENTIFIERS), 'proteins given in FASTA file', fasta_file)
+    # -----------------------------------------------------------------------------------------------------------
+    for mismatch in mismatches:
+        print(mismatch)
+    if mismatches:
+        sys.exit(1)
+    print('All features and predictions agree with the reference outputs.')
+    # -----------------------------------------------------------------------------------------------------------
+    return
+
+if __name__ == '__main__':
+    main()
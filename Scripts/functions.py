@@ -25,12 +25,17 @@
 # -----------------------------------------------------------------------------------------------------------
 import os
 import sys
-import re
-import io
 import getopt
+import math
+import mmap
+import stat
+import struct
 # -----------------------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------------------
 # -----------------------------------------------------------------------------------------------------------
+# Proteins shorter than this are not classified; by default only empty sequences are skipped
+MIN_LENGTH = 1
+# -----------------------------------------------------------------------------------------------------------
 def usage():
     """ Function: usage()
 
@@ -57,6 +62,9 @@ def usage():
     print("options for output format:")
     print("-s : short output format that provides predictions for all proteins as one tab-delimited table [default long format]")
     print()
+    print("options for input filtering:")
+    print("-l <n> : report proteins shorter than <n> amino acids as non-effectors without classification [default " + str(MIN_LENGTH) + "]")
+    print()
     print("options directing output:")
     print("-o <f> : direct output to file <f>, not stdout")
     print("-E <f> : save predicted effectors to FASTA file <f>")
@@ -77,7 +85,7 @@ def scan_arguments(commandline):
         Return:   Parsed options.
     """
     try:
-        opts, args = getopt.getopt(commandline, "hso:E:i:", ["help"])        
+        opts, args = getopt.getopt(commandline, "hso:E:i:l:", ["help"])        
     except getopt.GetoptError as err:
         # print help information and exit:
         print(str(err)) # will print something like "option -a not recognized"
@@ -88,8 +96,9 @@ def scan_arguments(commandline):
     short_format = False
     output_file = None
     effector_output = None
+    min_length = MIN_LENGTH
 
-    i_count, o_count, E_count, P_count = 0, 0, 0, 0
+    i_count, o_count, E_count, P_count, l_count = 0, 0, 0, 0, 0
    
     for opt, arg in opts:
         if opt in ("-o"):
@@ -103,54 +112,83 @@ def scan_arguments(commandline):
         elif opt in ("-E"):
             effector_output = arg
             E_count += 1
+        elif opt in ("-l"):
+            try:
+                min_length = int(arg)
+            except ValueError:
+                usage()
+            l_count += 1
         elif opt in ("-h", "--help"):
             usage()
         else:
             assert False, "unhandled option"
 
-    if i_count > 1 or o_count > 1 or E_count > 1:
+    if i_count > 1 or o_count > 1 or E_count > 1 or l_count > 1 or min_length < 1:
        usage()
 
-    return FASTA_FILE, short_format, output_file, effector_output
+    return FASTA_FILE, short_format, output_file, effector_output, min_length
+# -----------------------------------------------------------------------------------------------------------
+def read_fasta(FASTA_FILE):
+    """ Function: read_fasta()
+
+        Purpose:  Given a FASTA format file, lazily generate its records in 
+                  the order in which they appear in the FASTA file. Regular 
+                  files are memory-mapped and each record is sliced out of the
+                  map, so no per-line work is done in Python. Other inputs,
+                  e.g. pipes, are read into memory first.
+              
+        Input:    Path to FASTA format file.
+    
+        Return:   Generator of (identifier, sequence) tuples. Whitespace and 
+                  stop codons (*) are removed from the sequences.
+    """ 
+    with open(FASTA_FILE, 'rb') as f:
+        status = os.fstat(f.fileno())
+        # mmap cannot map an empty file, and pipes or FIFOs report a size of 0
+        if stat.S_ISREG(status.st_mode) and status.st_size:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            content = f.read()
+
+    if isinstance(content, mmap.mmap):
+        with content:
+            yield from split_fasta(content)
+    else:
+        yield from split_fasta(content)
 # -----------------------------------------------------------------------------------------------------------
-# This is the ARFF file header in WEKA format
-ARFF_HEADER = '''@RELATION effectors
-@ATTRIBUTE Tiny NUMERIC
-@ATTRIBUTE Small NUMERIC
-@ATTRIBUTE Aliphatic NUMERIC
-@ATTRIBUTE Aromatic NUMERIC
-@ATTRIBUTE Nonpolar NUMERIC
-@ATTRIBUTE Polar NUMERIC
-@ATTRIBUTE Charged NUMERIC
-@ATTRIBUTE Basic NUMERIC
-@ATTRIBUTE Acidic NUMERIC
-@ATTRIBUTE A NUMERIC
-@ATTRIBUTE C NUMERIC
-@ATTRIBUTE D NUMERIC
-@ATTRIBUTE E NUMERIC
-@ATTRIBUTE F NUMERIC
-@ATTRIBUTE G NUMERIC
-@ATTRIBUTE H NUMERIC
-@ATTRIBUTE I NUMERIC
-@ATTRIBUTE K NUMERIC
-@ATTRIBUTE L NUMERIC
-@ATTRIBUTE M NUMERIC
-@ATTRIBUTE N NUMERIC
-@ATTRIBUTE P NUMERIC
-@ATTRIBUTE Q NUMERIC
-@ATTRIBUTE R NUMERIC
-@ATTRIBUTE S NUMERIC
-@ATTRIBUTE T NUMERIC
-@ATTRIBUTE V NUMERIC
-@ATTRIBUTE W NUMERIC
-@ATTRIBUTE Y NUMERIC
-@ATTRIBUTE MW NUMERIC
-@ATTRIBUTE Charge NUMERIC
-@ATTRIBUTE Length NUMERIC
-@ATTRIBUTE class {effector,non-effector}
-
-@DATA
-'''
+def split_fasta(content):
+    """ Function: split_fasta()
+
+        Purpose:  Given the content of a FASTA format file, generate its 
+                  records in the order in which they appear.
+              
+        Input:    Bytes or memory map of a FASTA format file.
+    
+        Return:   Generator of (identifier, sequence) tuples. Whitespace and 
+                  stop codons (*) are removed from the sequences.
+    """ 
+    # Skip anything before the first record
+    if content[:1] == b'>':
+        start = 1
+    else:
+        start = content.find(b'\n>')
+        if start == -1:
+            return
+        start += 2
+
+    while True:
+        end = content.find(b'\n>', start)
+        record = content[start:end] if end != -1 else content[start:]
+        newline = record.find(b'\n')
+        if newline == -1:
+            newline = len(record)
+        identifier = record[:newline].strip().decode()
+        sequence = record[newline + 1:].translate(None, b'\n\r\t *').decode()
+        yield identifier, sequence
+
+        if end == -1:
+            break
+        start = end + 2
 # -----------------------------------------------------------------------------------------------------------
 def get_seqs_ids_fasta(FASTA_FILE):
     """ Function: get_seqs_ids_fasta()
@@ -167,261 +205,368 @@ def get_seqs_ids_fasta(FASTA_FILE):
     identifiers = []
     sequences = []
 
-    with open(FASTA_FILE) as f: 
-        content = f.readlines()
-
-        for position, line in enumerate(content):
-            if '>' in line:
-                identifiers.append(line)
-                seq = []
-                following_lines = content[position + 1:]
-                for next_line in following_lines:
-                    if '>' not in next_line:
-                        seq.append(next_line.strip())
-                    else:
-                        break
-                sequence = "".join(seq)
-                sequence = sequence.replace('*', '')
-                sequences.append(sequence)
+    for identifier, sequence in read_fasta(FASTA_FILE):
+        identifiers.append(identifier)
+        sequences.append(sequence)
 
     return identifiers, sequences
 # -----------------------------------------------------------------------------------------------------------
-def write_FASTA_short_ids(f_output, ORIGINAL_IDENTIFIERS, ORIGINAL_SEQUENCES):
-    """ Function: write_FASTA_short_ids()
-
-        Purpose:  Given a list of identifiers and the corresponding list 
-                  of sequence, write these to a FASTA file using short
-                  identifiers such as protein1, protein2, .... This is 
-                  done because some programs like pepstats do not like 
-                  long identifier names as input.
+# Amino acid data from the EMBOSS 6.5.7 files Emolwt.dat (average residue weights) and Eamino.dat 
+# (charges and property classes), so that the pepstats features can be computed without EMBOSS
+RESIDUE_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+RESIDUE_WEIGHTS = {'A': 71.0788, 'B': 114.5962, 'C': 103.1388, 'D': 115.0886, 'E': 129.1155, 'F': 147.1766,
+                   'G': 57.0519, 'H': 137.1411, 'I': 113.1594, 'J': 113.1594, 'K': 128.1741, 'L': 113.1594,
+                   'M': 131.1926, 'N': 114.1038, 'O': 237.3018, 'P': 97.1167, 'Q': 128.1307, 'R': 156.1875,
+                   'S': 87.0782, 'T': 101.1051, 'U': 150.0388, 'V': 99.1326, 'W': 186.2132, 'X': 118.8860,
+                   'Y': 163.1760, 'Z': 128.6231}
+HYDROGEN_WEIGHT, OXYGEN_WEIGHT = 1.00794, 15.9994
+RESIDUE_CHARGES = {'B': -0.5, 'D': -1.0, 'E': -1.0, 'H': 0.5, 'K': 1.0, 'O': 1.0, 'R': 1.0, 'Z': -0.5}
+# Tiny, small, aliphatic, aromatic, non-polar, polar, charged, basic and acidic
+AMINO_ACID_CLASSES = ['ACGSTU', 'ABCDGNPSTUV', 'AIJLV', 'FHWY', 'ACFGIJLMPUVWY', 'DEHKNOQRSTZ', 'BDEHKORZ', 'HKOR', 'BDEZ']
+# -----------------------------------------------------------------------------------------------------------
+def compute_features(SEQUENCES):
+    """ Function: compute_features()
+
+        Purpose:  Compute the protein features that pepstats would report for 
+                  each sequence (molecular weight, charge and amino acid class 
+                  percentages) as well as the amino acid frequencies and length.
+                  The pepstats values are rounded as in the pepstats output.
               
-        Input:    Path to desired FASTA format output file, list of 
-                  identifiers and list of corresponding sequences.
+        Input:    List of sequences. 
     
-        Return:   List of short identifiers.
+        Return:   List of feature vectors (amino acid classes, amino acid 
+                  frequencies, molecular weight, charge and length) in the 
+                  order of the sequences.
+    """
+    X = []
+
+    for sequence in SEQUENCES:
+        sequence = sequence.strip()
+        length = float(len(sequence))
+        # Amino acid frequencies in the sequence
+        amino_acid_frequencies = [100.0*sequence.count(amino_acid)/length for amino_acid in AMINO_ACIDS]
+
+        upper_sequence = sequence.upper()
+        counts = dict((residue, upper_sequence.count(residue)) for residue in RESIDUE_LETTERS)
+        # pepstats ignores characters that are not residue letters, e.g. gaps and digits
+        residues = float(sum(counts.values()))
+        molecular_weight = math.fsum(counts[residue] * RESIDUE_WEIGHTS[residue] for residue in RESIDUE_LETTERS)
+        molecular_weight += HYDROGEN_WEIGHT + (OXYGEN_WEIGHT + HYDROGEN_WEIGHT)
+
+        # Like pepstats, count B as D or N and Z as E or Q using Dayhoff frequencies
+        if counts['B']:
+            j = int(0.5 + counts['B'] * 5.5 / 9.8)
+            counts['D'] += j
+            counts['N'] += counts['B'] - j
+            counts['B'] = 0
+        if counts['Z']:
+            j = int(0.5 + counts['Z'] * 6.0 / 9.9)
+            counts['E'] += j
+            counts['Q'] += counts['Z'] - j
+            counts['Z'] = 0
+
+        charge = sum(counts[residue] * RESIDUE_CHARGES[residue] for residue in RESIDUE_CHARGES)
+        amino_acid_classes = [float('%.3f' % (100.0*sum(counts[residue] for residue in class_residues)/residues))
+                              if residues else 0.0 for class_residues in AMINO_ACID_CLASSES]
+
+        X.append(amino_acid_classes + amino_acid_frequencies + [float('%.2f' % molecular_weight), float('%.1f' % charge), length])
+
+    return X
+# -----------------------------------------------------------------------------------------------------------
+# Java serialization type codes and primitive field formats used to read WEKA model files
+JAVA_PRIMITIVES = {'B': 'b', 'C': 'H', 'D': 'd', 'F': 'f', 'I': 'i', 'J': 'q', 'S': 'h', 'Z': '?'}
+TC_NULL, TC_REFERENCE, TC_CLASSDESC, TC_OBJECT, TC_STRING, TC_ARRAY = 0x70, 0x71, 0x72, 0x73, 0x74, 0x75
+TC_BLOCKDATA, TC_ENDBLOCKDATA, TC_BLOCKDATALONG = 0x77, 0x78, 0x7A
+# -----------------------------------------------------------------------------------------------------------
+class JavaObjectReader(object):
+    """ Class: JavaObjectReader
+
+        Purpose:  Minimal reader for the Java object serialization stream that 
+                  WEKA uses to save models. Objects are returned as dictionaries
+                  of their field values, arrays as lists and strings as str.
+                  Custom writeObject() data is skipped.
     """
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.handles = []
+        if self.read('HH') != (0xACED, 5):
+            raise ValueError('Not a Java serialization stream.')
+
+    def read(self, fmt):
+        values = struct.unpack_from('>' + fmt, self.data, self.pos)
+        self.pos += struct.calcsize('>' + fmt)
+        return values[0] if len(values) == 1 else values
+
+    def read_utf(self):
+        length = self.read('H')
+        self.pos += length
+        return self.data[self.pos - length:self.pos].decode('utf-8')
+
+    def new_handle(self, obj):
+        self.handles.append(obj)
+        return obj
+
+    def read_content(self):
+        tc = self.read('B')
+        if tc == TC_NULL:
+            return None
+        elif tc == TC_REFERENCE:
+            return self.handles[self.read('I') - 0x7E0000]
+        elif tc == TC_CLASSDESC:
+            return self.read_class_desc()
+        elif tc == TC_OBJECT:
+            return self.read_object()
+        elif tc == TC_STRING:
+            return self.new_handle(self.read_utf())
+        elif tc == TC_ARRAY:
+            return self.read_array()
+        elif tc in (TC_BLOCKDATA, TC_BLOCKDATALONG):
+            length = self.read('B' if tc == TC_BLOCKDATA else 'I')
+            self.pos += length
+            return None
+        raise ValueError('Unsupported Java serialization type code 0x%02x at byte %d.' % (tc, self.pos - 1))
+
+    def skip_annotation(self):
+        while self.data[self.pos] != TC_ENDBLOCKDATA:
+            self.read_content()
+        self.pos += 1
+
+    def read_class_desc(self):
+        name = self.read_utf()
+        # Skip the serialVersionUID
+        self.pos += 8
+        desc = self.new_handle({'name': name, 'fields': []})
+        desc['flags'] = self.read('B')
+        for __ in range(self.read('H')):
+            typecode = chr(self.read('B'))
+            desc['fields'].append((typecode, self.read_utf()))
+            if typecode in 'L[':
+                # Class name of an object field
+                self.read_content()
+        self.skip_annotation()
+        desc['super'] = self.read_content()
+        return desc
+
+    def read_value(self, typecode):
+        if typecode in JAVA_PRIMITIVES:
+            return self.read(JAVA_PRIMITIVES[typecode])
+        return self.read_content()
+
+    def read_object(self):
+        desc = self.read_content()
+        obj = self.new_handle({'class': desc['name']})
+        # Field values are written starting with the topmost superclass
+        hierarchy = []
+        while desc:
+            hierarchy.insert(0, desc)
+            desc = desc['super']
+        for desc in hierarchy:
+            if desc['flags'] & 0x04:
+                raise ValueError('Externalizable class %s is not supported.' % desc['name'])
+            for typecode, field in desc['fields']:
+                obj[field] = self.read_value(typecode)
+            if desc['flags'] & 0x01:
+                self.skip_annotation()
+        return obj
+
+    def read_array(self):
+        desc = self.read_content()
+        array = self.new_handle([])
+        for __ in range(self.read('i')):
+            array.append(self.read_value(desc['name'][1]))
+        return array
+# -----------------------------------------------------------------------------------------------------------
+def read_weka_model(model_file):
+    """ Function: read_weka_model()
 
-    with open(f_output, 'w') as f:
-        SHORT_IDENTIFIERS = []
-        # Change identifiers to protein1, protein2, ...
-        # and write to temporary file
-        SET = zip(ORIGINAL_IDENTIFIERS, ORIGINAL_SEQUENCES)
+        Purpose:  Read the class priors and the per-class normal distributions
+                  of each attribute from a serialized WEKA NaiveBayes model, so
+                  that proteins can be classified without starting WEKA.
+              
+        Input:    Path to WEKA NaiveBayes model file.                  
     
-        for index,  (identifier, sequence) in enumerate(SET):
-            short_id = '>protein' + str(index)
-            SHORT_IDENTIFIERS.append(short_id)
-            f.writelines(short_id + '\n')
-            f.writelines(sequence + '\n')
+        Return:   Dictionary with the class names, class priors, attribute weights
+                  and a (mean, standard deviation, precision) tuple for each 
+                  attribute and class. 
+    """
+    with open(model_file, 'rb') as f:
+        classifier = JavaObjectReader(f.read()).read_content()
+
+    if classifier['class'] != 'weka.classifiers.bayes.NaiveBayes':
+        raise ValueError('%s is not a WEKA NaiveBayes model.' % model_file)
+    if classifier['m_UseDiscretization'] or classifier['m_UseKernelEstimator']:
+        raise ValueError('Only NaiveBayes models with normal distributions are supported.')
+
+    header = classifier['m_Instances']
+    attributes = header['m_Attributes']['m_Objects'][:header['m_Attributes']['m_Size']]
+    class_attribute = attributes[header['m_ClassIndex']]
+    class_values = class_attribute['m_Values']
+
+    class_distribution = classifier['m_ClassDistribution']
+    priors = [count / class_distribution['m_SumOfCounts'] for count in class_distribution['m_Counts']]
+
+    estimators = []
+    for attribute_estimators in classifier['m_Distributions']:
+        estimators.append([(estimator['m_Mean'], estimator['m_StandardDev'], estimator['m_Precision'])
+                           for estimator in attribute_estimators])
+
+    model = {}
+    model['classes'] = class_values['m_Objects'][:class_values['m_Size']]
+    model['priors'] = priors
+    model['weights'] = [attribute['m_Weight'] for attribute in attributes if attribute is not class_attribute]
+    model['estimators'] = estimators
+
+    return model
+# -----------------------------------------------------------------------------------------------------------
+# EffectorP Naive Bayes model trained with WEKA
+MODEL_FILE = 'trainingdata_samegenomes_iteration15_ratio3_bayes.model'
+# -----------------------------------------------------------------------------------------------------------
+def load_model(SCRIPT_PATH):
+    """ Function: load_model()
 
-    return SHORT_IDENTIFIERS
+        Purpose:  Load the EffectorP Naive Bayes model from the WEKA model file.
+              
+        Input:    Path to the folder that contains the model file.                  
+    
+        Return:   Dictionary as returned by read_weka_model(). 
+    """
+    return read_weka_model(os.path.join(SCRIPT_PATH, MODEL_FILE))
 # -----------------------------------------------------------------------------------------------------------
-def pepstats(SHORT_IDENTIFIERS, SEQUENCES, pepstats_file):
-    """ Function: pepstats()
+# sqrt(1/2), used to evaluate the normal distribution like WEKA
+SQRTH = 7.07106781186547524401E-1
+# -----------------------------------------------------------------------------------------------------------
+def normal_probability(a):
+    """ Function: normal_probability()
 
-        Purpose:  Given a set that contains the list of identifiers and 
-                  the corresponding list of sequences, scan the given 
-                  pepstats result file to extract protein properties.
+        Purpose:  Area under the standard normal density from minus infinity to a,
+                  computed the same way as weka.core.Statistics.normalProbability.
               
-        Input:    Set that contains the list of identifiers and 
-                  the corresponding list of sequences and peptstats 
-                  result file. 
+        Input:    Upper integration limit.                  
     
-        Return:   Dictionary of protein properties for each protein in the 
-                  set.
+        Return:   Cumulative probability. 
     """
+    x = a * SQRTH
+    z = abs(x)
+
+    if z < SQRTH:
+        return 0.5 + 0.5 * math.erf(x)
 
-    pepstats_dic = {}
-
-    with open(pepstats_file) as f: 
-        content = f.readlines()
-        for start, line in enumerate(content):
-            if 'PEPSTATS of ' in line:
-                TARGET_ID = line.split('PEPSTATS of ')[1]
-                TARGET_ID = TARGET_ID.split('from 1 to')[0]
-                TARGET_ID = TARGET_ID.strip()
-                sequence = None
-
-                for (identifier, seq) in zip(SHORT_IDENTIFIERS, SEQUENCES):
-                    if identifier.replace('>', '') == TARGET_ID:
-                        sequence = seq.strip()
-
-                if sequence:
-                    length = float(len(sequence))
-                    # Amino acid frequencies in the sequence
-                    amino_acid_frequencies = []
-                    amino_acid_frequencies.append(100.0*sequence.count('A')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('C')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('D')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('E')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('F')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('G')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('H')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('I')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('K')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('L')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('M')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('N')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('P')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('Q')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('R')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('S')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('T')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('V')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('W')/length)
-                    amino_acid_frequencies.append(100.0*sequence.count('Y')/length)
-                    # Extract molecular weight
-                    mwline = content[start + 2:start + 3]
-                    molecular_weight = float(re.findall(r"\d+.\d+", str(mwline))[0])
-                    # Extract charge
-                    charge_line = content[start + 3:start + 4]
-                    charge = float(re.findall(r"[-+]?\d+.\d+", str(charge_line))[1])
-                    # Extract amino acid class frequencies
-
-		            # Watch out, in the pepstats software, if isoelectric point == None, an 
-                    # extra line will be introduced
-                    start_aas = content[start:].index('Property\tResidues\t\tNumber\t\tMole%\n')
-                    perline = content[start + start_aas + 1:start + start_aas + 10]
-
-                    tiny = float(re.findall(r"\d+.\d+", str(perline[0]))[-1])
-                    small = float(re.findall(r"\d+.\d+", str(perline[1]))[-1])
-                    aliphatic = float(re.findall(r"\d+.\d+", str(perline[2]))[-1])
-                    aromatic = float(re.findall(r"\d+.\d+", str(perline[3]))[-1])
-                    non_polar = float(re.findall(r"\d+.\d+", str(perline[4]))[-1])
-                    polar = float(re.findall(r"\d+.\d+", str(perline[5]))[-1])
-                    charged = float(re.findall(r"\d+.\d+", str(perline[6]))[-1])
-                    basic = float(re.findall(r"\d+.\d+", str(perline[7]))[-1])
-                    acidic = float(re.findall(r"\d+.\d+", str(perline[8]))[-1])
-                    amino_acid_classes = []
-                    amino_acid_classes.append(tiny)
-                    amino_acid_classes.append(small)
-                    amino_acid_classes.append(aliphatic)
-                    amino_acid_classes.append(aromatic)
-                    amino_acid_classes.append(non_polar)
-                    amino_acid_classes.append(polar)
-                    amino_acid_classes.append(charged)
-                    amino_acid_classes.append(basic)
-                    amino_acid_classes.append(acidic)
-                    # Store values in dictionary
-                    pepstats_dic[TARGET_ID] = molecular_weight, charge, amino_acid_classes, amino_acid_frequencies, length
-
-                else:
-                    print('There was an error scanning the pepstats file.')
-                    print('Could not find corresponding sequence for identifier', TARGET_ID)
-                    sys.exit(1)
-
-    return pepstats_dic
+    y = 0.5 * math.erfc(z)
+    if x > 0:
+        return 1.0 - y
+    return y
 # -----------------------------------------------------------------------------------------------------------
-def write_weka_input(weka_input, SHORT_IDENTIFIERS, pepstats_dic):
-    """ Function: write_weka_input()
+def predict_nb(model, X):
+    """ Function: predict_nb()
 
-        Purpose:  Given the query identifiers and pepstats-calculated
-                  protein features, write the input arff file for WEKA. 
+        Purpose:  Classify each protein feature vector with the Naive Bayes model,
+                  reproducing the predictions of WEKA's NaiveBayes classifier.
               
-        Input:    WEKA arff file name, query identifiers and pepstats dictionary.                  
+        Input:    Model read with read_weka_model() and list of feature vectors.                  
     
-        Return:   None. 
-    """   
-    with open(weka_input, 'w') as f:
-        # Create a list of features for each protein
-        X = [[] for __ in range(len(SHORT_IDENTIFIERS))]
-
-        for protein_position, TARGET_ID in enumerate(SHORT_IDENTIFIERS):
-            TARGET_ID = TARGET_ID.replace('>', '')
-            TARGET_ID = TARGET_ID.strip()
-
-            molecular_weight, charge, amino_acid_classes, amino_acid_frequencies, length = pepstats_dic[TARGET_ID]
-            X[protein_position] = amino_acid_classes + amino_acid_frequencies + [molecular_weight, charge, length]
- 
-        # Write protein feature data to WEKA arff file
-        f.writelines(ARFF_HEADER)
-        for index, vector in enumerate(X):
-            for feature in vector:
-                f.writelines(str(feature) + ',')
-            f.writelines('?\n')
-
-    return
+        Return:   List of (predicted class, probability) tuples, one per feature vector.
+                  The probability is rounded to three decimals as in the WEKA output.
+    """
+    nb_predictions = []
+    classes = range(len(model['classes']))
+
+    for vector in X:
+        probs = list(model['priors'])
+
+        for value, weight, estimators in zip(vector, model['weights'], model['estimators']):
+            max_prob = 0.0
+            for j in classes:
+                mean, standard_dev, precision = estimators[j]
+                # WEKA rounds values to the precision of the attribute estimator
+                value_rounded = round(value / precision) * precision
+                z_lower = (value_rounded - mean - precision / 2) / standard_dev
+                z_upper = (value_rounded - mean + precision / 2) / standard_dev
+                p = normal_probability(z_upper) - normal_probability(z_lower)
+                probs[j] *= max(1e-75, p ** weight)
+                max_prob = max(max_prob, probs[j])
+            # Danger of probability underflow
+            if 0 < max_prob < 1e-75:
+                probs = [prob * 1e75 for prob in probs]
+
+        total = sum(probs)
+        probs = [prob / total for prob in probs]
+        predicted = probs.index(max(probs))
+        nb_predictions.append((model['classes'][predicted], int(probs[predicted] * 1000 + 0.5) / 1000.0))
+
+    return nb_predictions
 # -----------------------------------------------------------------------------------------------------------
-def parse_weka_output(file_input, ORIGINAL_IDENTIFIERS, SEQUENCES):
-    """ Function: parse_weka_output()
+def parse_predictions(nb_predictions, ORIGINAL_IDENTIFIERS, SEQUENCES):
+    """ Function: parse_predictions()
 
-        Purpose:  Given the WEKA output file and the query identifiers and sequences, 
-                  parse the predicted class for each protein from the WEKA output. 
-                  Write the predicted effectors to a FASTA file.
+        Purpose:  Given the Naive Bayes predictions and the query identifiers and sequences, 
+                  collect the predicted class for each protein. 
               
-        Input:    WEKA output file and the query identifiers and sequences.                  
+        Input:    Naive Bayes predictions and the query identifiers and sequences.                  
     
         Return:   The set of predicted effectors only as well as all predictions. 
     """    
     predicted_effectors, predictions = [], []
 
-    with open(file_input) as f:
-
-        content = f.readlines()
-        content_start = content.index(' inst#     actual  predicted error prediction (Tiny,Small,Aliphatic,Aromatic,Nonpolar,Polar,Charged,Basic,Acidic,A,C,D,E,F,G,H,I,K,L,M,N,P,Q,R,S,T,V,W,Y,MW,Charge,Length)\n')
-        content = content[content_start + 1:]
-
-        for line in content:
-            if line.strip():
-                position = line.split()[0]
-                prediction = line.split()[2]
-                prob = float(line.split()[3])        
- 
-                # WEKA output counts from position 1, our identifiers are counted from zero
-                identifier = ORIGINAL_IDENTIFIERS[int(position) - 1]
-                sequence = SEQUENCES[int(position) - 1]
-
-                if 'non-eff' in prediction:                               
-                    noneffector = identifier.strip()
-                    noneffector = noneffector.replace('>', '')  
-                    predictions.append((noneffector, 'Non-effector', prob, sequence))
-                else:                    
-                    effector = identifier.strip()
-                    effector = effector.replace('>', '')                                               
-                    predictions.append((effector, 'Effector', prob, sequence))
-	            # Append predicted effector to list of predicted effectors
-                    predicted_effectors.append((effector, prob, sequence))
+    for (prediction, prob), identifier, sequence in zip(nb_predictions, ORIGINAL_IDENTIFIERS, SEQUENCES):
+        if 'non-eff' in prediction:                               
+            noneffector = identifier.strip()
+            noneffector = noneffector.replace('>', '')  
+            predictions.append((noneffector, 'Non-effector', prob, sequence))
+        else:                    
+            effector = identifier.strip()
+            effector = effector.replace('>', '')                                               
+            predictions.append((effector, 'Effector', prob, sequence))
+            # Append predicted effector to list of predicted effectors
+            predicted_effectors.append((effector, prob, sequence))
 
     return predicted_effectors, predictions
 # -----------------------------------------------------------------------------------------------------------
 def short_output(predictions):
     """ Function: short_output()
 
-        Purpose:  Given the WEKA predictions for each protein, write  
-                  string that contains the short output format.
+        Purpose:  Given the predictions for each protein, generate the 
+                  lines of the short output format.
               
-        Input:    WEKA predictions for each protein.                  
+        Input:    Predictions for each protein.                  
     
-        Return:   String that contains predictions for all proteins as tab-delimited table.
+        Return:   Generator of lines that contain predictions for all proteins as tab-delimited table.
     """
     # Output predictions for all proteins as tab-delimited table
-    short_output_string = '# Identifier \t Prediction \t Probability \n'
+    yield '# Identifier \t Prediction \t Probability \n'
     for protein, pred, prob, sequence in predictions:    
-        short_output_string += protein + '\t' + pred + '\t' + str(prob) + '\n'            
-
-    return short_output_string
+        yield protein + '\t' + pred + '\t' + str(prob) + '\n'            
 # -----------------------------------------------------------------------------------------------------------
-def long_output(ORIGINAL_IDENTIFIERS, predicted_effectors):
+def long_output(predictions, predicted_effectors, min_length = MIN_LENGTH):
     """ Function: long_output()
 
-        Purpose:  Given the predicted effectors and identifiers for the test set,  
-                  write string that contains the long output format.
+        Purpose:  Given all predictions and the predicted effectors for the test set,  
+                  generate the lines of the long output format. Proteins that 
+                  were skipped because they are shorter than the minimum length
+                  are not counted as tested.
               
-        Input:    Predicted effectors and identifiers of test set.                  
+        Input:    Predictions for each protein, predicted effectors and the 
+                  minimum protein length that was classified.
     
-        Return:   String that contains list of predicted effectors with posterior probabilites
+        Return:   Generator of lines that contain the list of predicted effectors with posterior probabilites
                   and a short statistic on the percentage of predicted effectors in the test set.
     """
+    # Proteins that were not classified have no probability
+    skipped = sum(1 for protein, pred, prob, sequence in predictions if prob == '-')
+    tested = len(predictions) - skipped
+
     # Output predicted effectors for long format
-    long_output_string = '-----------------\n'
-    long_output_string += 'Predicted effectors:\n\n'
+    yield '-----------------\n'
+    yield 'Predicted effectors:\n\n'
     for effector, prob, sequence in predicted_effectors:
-        long_output_string += effector + '| Effector probability:' + str(prob) + '\n'
-
-    long_output_string += '-----------------\n\n'
-    long_output_string += 'Number of proteins that were tested: ' + str(len(ORIGINAL_IDENTIFIERS)) + '\n' 
-    long_output_string += 'Number of predicted effectors: ' + str(len(predicted_effectors)) + '\n' 
-    long_output_string += '\n' + '-----------------' + '\n' 
-    long_output_string += str(round(100.0*len(predicted_effectors)/len(ORIGINAL_IDENTIFIERS), 1)) + ' percent are predicted to be effectors.'  
-    long_output_string += '\n' + '-----------------' + '\n'
-
-    return long_output_string
\ No newline at end of file
+        yield effector + '| Effector probability:' + str(prob) + '\n'
+
+    yield '-----------------\n\n'
+    yield 'Number of proteins that were tested: ' + str(tested) + '\n' 
+    if skipped:
+        yield 'Number of proteins that were skipped (shorter than ' + str(min_length) + ' aa): ' + str(skipped) + '\n'
+    yield 'Number of predicted effectors: ' + str(len(predicted_effectors)) + '\n' 
+    yield '\n' + '-----------------' + '\n' 
+    yield str(round(100.0*len(predicted_effectors)/tested, 1) if tested else 0.0) + ' percent are predicted to be effectors.'  
+    yield '\n' + '-----------------' + '\n'